@@ -0,0 +1,134 @@
+# micropython_shim.py
+#
+# Minimal stand-ins for the MicroPython APIs the firmware uses, so the
+# hot paths can be imported and benchmarked under CPython. Only what the
+# benchmarked modules touch is provided; this is not a simulator.
+
+import sys
+import time
+import types
+
+_TICKS_PERIOD = 1 << 30
+_TICKS_MASK = _TICKS_PERIOD - 1
+
+
+def _ticks_ms():
+    return (time.monotonic_ns() // 1000000) & _TICKS_MASK
+
+
+def _ticks_us():
+    return (time.monotonic_ns() // 1000) & _TICKS_MASK
+
+
+def _ticks_diff(a, b):
+    return ((a - b + _TICKS_PERIOD // 2) & _TICKS_MASK) - _TICKS_PERIOD // 2
+
+
+def _ticks_add(a, delta):
+    return (a + delta) & _TICKS_MASK
+
+
+def _sleep_ms(ms):
+    time.sleep(ms / 1000)
+
+
+def _sleep_us(us):
+    time.sleep(us / 1000000)
+
+
+class Pin:
+    IN = 0
+    OUT = 1
+    PULL_UP = 1
+    PULL_DOWN = 2
+    IRQ_RISING = 4
+    IRQ_FALLING = 8
+
+    def __init__(self, pin, mode=-1, pull=-1, value=None):
+        self.pin = pin
+        self._value = 0 if value is None else value
+
+    def value(self, v=None):
+        if v is None:
+            return self._value
+        self._value = 1 if v else 0
+
+    def on(self):
+        self._value = 1
+
+    def off(self):
+        self._value = 0
+
+    high = on
+    low = off
+
+    def toggle(self):
+        self._value ^= 1
+
+    def irq(self, trigger=None, handler=None):
+        self.handler = handler
+
+
+class PWM:
+    def __init__(self, pin):
+        self.pin = pin
+        self._duty = 0
+        self._freq = 0
+
+    def freq(self, f=None):
+        if f is None:
+            return self._freq
+        self._freq = f
+
+    def duty_u16(self, d=None):
+        if d is None:
+            return self._duty
+        self._duty = d
+
+    def deinit(self):
+        pass
+
+
+class UART:
+    def __init__(self, id, baudrate=115200, tx=None, rx=None, rxbuf=256):
+        self.tx = bytearray()
+
+    def read(self, n=-1):
+        return None
+
+    def write(self, data):
+        self.tx += data
+        return len(data)
+
+    def any(self):
+        return 0
+
+
+def _const(value):
+    return value
+
+
+def install():
+    """Register stub `machine`/`micropython` modules and add time.ticks_*."""
+    if "machine" not in sys.modules:
+        machine = types.ModuleType("machine")
+        machine.Pin = Pin
+        machine.PWM = PWM
+        machine.UART = UART
+        sys.modules["machine"] = machine
+
+    if "micropython" not in sys.modules:
+        micropython = types.ModuleType("micropython")
+        micropython.const = _const
+        sys.modules["micropython"] = micropython
+
+    for name, fn in (
+        ("ticks_ms", _ticks_ms),
+        ("ticks_us", _ticks_us),
+        ("ticks_diff", _ticks_diff),
+        ("ticks_add", _ticks_add),
+        ("sleep_ms", _sleep_ms),
+        ("sleep_us", _sleep_us),
+    ):
+        if not hasattr(time, name):
+            setattr(time, name, fn)
@@ -0,0 +1,86 @@
+# run_bench.py
+#
+# CPython benchmark runner with stored baselines.
+#
+#   python bench/run_bench.py              # run, compare to bench/baseline.json
+#   python bench/run_bench.py --update     # run and overwrite the baseline
+#
+# Exits 1 if any case regresses: ops/sec below baseline by more than
+# --threshold, or more bytes allocated per call than the baseline.
+# Baselines are machine-specific; record them on the machine you compare on.
+
+import argparse
+import json
+import os
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+BASELINE = os.path.join(HERE, "baseline.json")
+
+sys.path.insert(0, HERE)
+sys.path.insert(0, ROOT)
+
+import micropython_shim  # noqa: E402
+
+micropython_shim.install()
+
+import benchmarks  # noqa: E402
+
+
+def compare(results, baseline, threshold):
+    regressions = []
+    for name, r in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        if r["ops"] < base["ops"] * (1.0 - threshold):
+            regressions.append(
+                f"{name}: ops {r['ops']} < baseline {base['ops']} (-{threshold:.0%})"
+            )
+        if r["alloc_b"] > base["alloc_b"]:
+            regressions.append(
+                f"{name}: alloc_b {r['alloc_b']} > baseline {base['alloc_b']}"
+            )
+    return regressions
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="CPython benchmark runner")
+    ap.add_argument("-n", "--iterations", type=int, default=20000)
+    ap.add_argument("--threshold", type=float, default=0.25,
+                    help="allowed fractional ops/sec drop (default 0.25)")
+    ap.add_argument("--only", nargs="*", help="run only these case names")
+    ap.add_argument("--update", action="store_true", help="write baseline.json")
+    ap.add_argument("--baseline", default=BASELINE)
+    args = ap.parse_args(argv)
+
+    results = benchmarks.run(iterations=args.iterations, only=args.only)
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    print(f"{'case':<26}{'ops/s':>12}{'p99 us':>9}{'alloc B':>9}{'vs base':>9}")
+    for name, r in results.items():
+        base = baseline.get(name)
+        delta = f"{r['ops'] / base['ops'] - 1:+.0%}" if base else "-"
+        print(f"{name:<26}{r['ops']:>12}{r['p99_us']:>9}{r['alloc_b']:>9}{delta:>9}")
+
+    if args.update:
+        baseline.update(results)
+        with open(args.baseline, "w") as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"baseline written: {args.baseline}")
+        return 0
+
+    regressions = compare(results, baseline, args.threshold)
+    for msg in regressions:
+        print("REGRESSION", msg)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
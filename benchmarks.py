@@ -0,0 +1,237 @@
+# benchmarks.py
+#
+# Hot-path micro-benchmarks. Runs on the device (BENCH command) and under
+# CPython via bench/run_bench.py, which installs a stub `machine` module.
+#
+# Per case reports:
+#   ops   calls per second (untimed batch loop)
+#   p99   99th percentile single-call latency in us
+#   alloc heap bytes per call: gc.mem_alloc() delta with GC off on MicroPython,
+#         tracemalloc peak of one call on CPython
+
+import gc
+import sys
+import time
+
+from command_parser import CommandParser
+import command_parser
+
+IS_MICROPYTHON = sys.implementation.name == "micropython"
+
+
+# ---------------------------------------------------------
+# FAKE HARDWARE (parser/control benches measure the Python work only)
+# ---------------------------------------------------------
+class _NullMotor:
+    pin_in1 = 0
+    pin_in2 = 0
+
+    def set_power(self, power):
+        pass
+
+    def set_duty(self, duty):
+        pass
+
+    def stop(self):
+        pass
+
+    def coast(self):
+        pass
+
+
+class _FixedEncoder:
+    def __init__(self, position=3, max_count=11):
+        self.position = position
+        self.max_count = max_count
+
+    def get_position(self):
+        return self.position
+
+    def get_angle(self):
+        return self.position / self.max_count
+
+    def distance_m(self):
+        return self.position * 0.001047
+
+
+class _NullUART:
+    def write(self, data):
+        return len(data)
+
+    def any(self):
+        return 0
+
+
+def _noprint(*args, **kwargs):
+    pass
+
+
+def make_parser():
+    return CommandParser(
+        uart=_NullUART(),
+        left_motor=_NullMotor(),
+        right_motor=_NullMotor(),
+        steering_motor=_NullMotor(),
+        watchdog=None,
+        left_encoder=_FixedEncoder(120),
+        right_encoder=_FixedEncoder(118),
+        steering_encoder=_FixedEncoder(3),
+        steering_target=0.5,
+        verbose=False,
+    )
+
+
+# ---------------------------------------------------------
+# CASES: name -> (setup() -> fn, touches_hardware)
+# ---------------------------------------------------------
+def _case_handle_line():
+    p = make_parser()
+    return lambda: p.handle_line("CMD 0.5 0.1")
+
+
+def _case_driving_stick():
+    p = make_parser()
+    return lambda: p.update_driving_stick(0.5)
+
+
+def _case_steering_pid():
+    p = make_parser()
+    return p.update_steering_pid
+
+
+def _case_emit_odometry():
+    p = make_parser()
+    uart = _NullUART()
+    return lambda: p.emit_odometry(uart)
+
+
+def _case_steering_stick():
+    p = make_parser()
+    p.steering_encoder = None   # no stall tracking; measure the curve path
+    return lambda: p.update_steering_stick(0.5)
+
+
+def _case_curve_lookup():
+    from response_curve import ResponseCurve
+    c = ResponseCurve(deadband=0.05, expo=0.3, min_duty=0.6, max_duty=0.8)
+    return lambda: c.lookup(0.5)
+
+
+def _case_drv_set_power():
+    from gpio_helper_p2 import DRV8871
+    m = DRV8871(pin_in1=16, pin_in2=18)
+    return lambda: m.set_power(0.5)
+
+
+def _case_driving_isr():
+    from encoder import DrivingEncoder
+    e = DrivingEncoder(pin_a=8, pin_b=9)
+    pin = e.pin_a
+    return lambda: e._update(pin)
+
+
+def _case_steering_isr():
+    from encoder import SteeringEncoder
+    e = SteeringEncoder(pin_a=26, pin_b=27)
+    pin = e.pin_a
+    return lambda: e._update(pin)
+
+
+CASES = (
+    ("parser.handle_line", _case_handle_line, False),
+    ("update_driving_stick", _case_driving_stick, False),
+    ("update_steering_stick", _case_steering_stick, False),
+    ("update_steering_pid", _case_steering_pid, False),
+    ("ResponseCurve.lookup", _case_curve_lookup, False),
+    ("emit_odometry", _case_emit_odometry, False),
+    ("DRV8871.set_power", _case_drv_set_power, True),
+    ("DrivingEncoder._update", _case_driving_isr, True),
+    ("SteeringEncoder._update", _case_steering_isr, True),
+)
+
+
+# ---------------------------------------------------------
+# MEASUREMENT
+# ---------------------------------------------------------
+if IS_MICROPYTHON:
+    def _now_us():
+        return time.ticks_us()
+
+    def _elapsed_us(t0):
+        return time.ticks_diff(time.ticks_us(), t0)
+
+    def _alloc_per_call(fn, n):
+        gc.collect()
+        gc.disable()
+        try:
+            before = gc.mem_alloc()
+            for _ in range(n):
+                fn()
+            return (gc.mem_alloc() - before) // n
+        finally:
+            gc.enable()
+else:
+    import tracemalloc
+
+    def _now_us():
+        return time.perf_counter_ns() // 1000
+
+    def _elapsed_us(t0):
+        return time.perf_counter_ns() // 1000 - t0
+
+    def _alloc_per_call(fn, n):
+        tracemalloc.start()
+        try:
+            fn()   # first traced call may allocate caches
+            base = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            fn()
+            return max(tracemalloc.get_traced_memory()[1] - base, 0)
+        finally:
+            tracemalloc.stop()
+
+
+def measure(fn, iterations):
+    for _ in range(iterations // 10 + 1):
+        fn()
+
+    t0 = _now_us()
+    for _ in range(iterations):
+        fn()
+    total_us = max(_elapsed_us(t0), 1)
+
+    samples = []
+    for _ in range(iterations):
+        t0 = _now_us()
+        fn()
+        samples.append(_elapsed_us(t0))
+    samples.sort()
+    p99 = samples[min(len(samples) - 1, (len(samples) * 99) // 100)]
+
+    return {
+        "ops": iterations * 1000000 // total_us,
+        "p99_us": p99,
+        "alloc_b": _alloc_per_call(fn, min(iterations, 100)),
+    }
+
+
+def run(iterations=1000, include_hardware=True, only=None):
+    """Run all cases; returns {name: {"ops", "p99_us", "alloc_b"}}."""
+    results = {}
+    command_parser.print = _noprint   # shadow builtin print in the parser module
+    try:
+        for name, setup, hw in CASES:
+            if hw and not include_hardware:
+                continue
+            if only is not None and name not in only:
+                continue
+            results[name] = measure(setup(), iterations)
+    finally:
+        del command_parser.print
+    return results
+
+
+def format_result(name, r):
+    return "BENCH {} ops={} p99_us={} alloc_b={}\r\n".format(
+        name, r["ops"], r["p99_us"], r["alloc_b"]
+    )
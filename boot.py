@@ -5,17 +5,26 @@
 from machine import Pin
 import time
 
-time.sleep_ms(2000)  # wait 2 seconds for USB enumeration to settle
-
 MOTOR_PINS = [4, 5, 7, 16, 18, 22]  # updated: 28 removed, 7 added
 
+# Drive pins LOW first — before any delay
 for p in MOTOR_PINS:
     Pin(p, Pin.OUT, value=0, pull=None)
 
+# Only wait for USB enumeration when a host is powering us (VBUS sense on
+# GP24). On battery, e.g. recovering from a brown-out, boot straight through.
+try:
+    usb_attached = Pin(24, Pin.IN).value() == 1
+except Exception:
+    usb_attached = True
+
+if usb_attached:
+    time.sleep_ms(2000)  # wait 2 seconds for USB enumeration to settle
+
 # Verify pins are actually LOW
 for p in MOTOR_PINS:
     val = Pin(p).value()
     if val != 0:
         print(f"WARNING: GP{p} is HIGH after init — E9 errata latch suspected")
     else:
-        print(f"GP{p}: OK")
\ No newline at end of file
+        print(f"GP{p}: OK")
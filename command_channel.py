@@ -0,0 +1,222 @@
+# command_channel.py
+#
+# Optional sequenced + checksummed framing for command lines.
+#
+#   framed line:   @<seq> <payload>*<crc>     e.g.  @17 CMD 0.50 -0.10*3A
+#   resync:        SYNC <seq>                 host's oldest unacked seq is <seq>
+#   replies:       ACK <seq> <win>            cumulative: everything up to <seq> received
+#                  NAK <seq> <win>            resend starting at <seq> (go-back-N)
+#                  SYNC <seq> <win>           in sync, device expects <seq> next
+#                  NOSYNC <win>               framed line refused: not in sync
+#
+# <seq> is 0..255 and wraps. <crc> is CRC-8 (poly 0x07) over every byte before
+# the '*', as two hex digits. <win> is the free space in bytes in the device
+# UART receive buffer, so the host can pipeline without overrunning it.
+# Unframed lines pass straight through so plain CMD/HB keep working.
+#
+# At most one SYNC reply plus one of NOSYNC/NAK/ACK is sent per flush().
+#
+# Recovery rules:
+#   - The device starts unsynced on every boot. Until a SYNC arrives, every
+#     framed line is dropped and answered with NOSYNC.
+#   - The host sends SYNC <seq> and must not send framed lines until a
+#     SYNC reply arrives; resend SYNC if it does not.
+#   - If the device is synced and <seq> is at most SEQ_SPAN behind its
+#     expected seq, frames <seq>..expected-1 were already executed: it keeps
+#     its expected seq so they are not run twice. Otherwise expected = <seq>.
+#     The reply always carries the device's expected seq; the host releases
+#     frames before it, or renumbers its unacked frames from it if it is
+#     outside the host's in-flight range.
+#   - A frame more than SEQ_SPAN behind or ahead of the expected seq means the
+#     host is out of step (e.g. it restarted): it is dropped and answered with
+#     NOSYNC. Within SEQ_SPAN, behind = duplicate (re-ACKed, not executed),
+#     ahead = gap (NAK).
+#   - A NAK is repeated at most every NAK_REPEAT_MS while the gap persists.
+#   - The host resyncs on NOSYNC, on a BOOT line, and on any ACK/NAK naming
+#     a seq outside its in-flight range. LINK records carry seq=<expected>
+#     (or seq=- while unsynced) so the host can also check periodically.
+
+import time
+
+SEQ_MOD = 256
+SEQ_SPAN = 32          # max frames in flight the device will reason about
+NAK_REPEAT_MS = 100
+
+
+def _make_crc8_table():
+    table = bytearray(256)
+    for i in range(256):
+        c = i
+        for _ in range(8):
+            if c & 0x80:
+                c = ((c << 1) ^ 0x07) & 0xFF
+            else:
+                c = (c << 1) & 0xFF
+        table[i] = c
+    return bytes(table)
+
+
+_CRC8_TABLE = _make_crc8_table()
+
+
+def crc8(data):
+    crc = 0
+    for b in data:
+        crc = _CRC8_TABLE[crc ^ b]
+    return crc
+
+
+class CommandChannel:
+    def __init__(self, rx_window=256, stats=None):
+        self.rx_window = rx_window
+        self.stats = stats
+
+        self.synced = False
+        self.expected = 0
+        self._ack_pending = False
+        self._nak_pending = False
+        self._sync_pending = False
+        self._sync_seq = 0
+        self._nosync_pending = False
+        self._last_nak = None   # ticks_ms of the last NAK sent for this gap
+
+        self.crc_errors = 0
+        self.seq_gaps = 0
+        self.duplicates = 0
+        self.out_of_sync = 0
+
+    # ------------------------------------------------------------
+    # Receive path
+    # ------------------------------------------------------------
+    def receive(self, line):
+        """
+        Unwrap one stripped line. Returns the payload to execute, or None
+        if the line was consumed (bad frame, duplicate, resync).
+        """
+        if line[0] != "@":
+            # Whole first token, any case, same as handle_line() dispatch
+            if line.split(None, 1)[0].upper() == "SYNC":
+                self._sync(line)
+                return None
+            return line
+
+        star = line.rfind("*")
+        space = line.find(" ")
+        if star < 0 or space < 0 or space > star:
+            self._reject_crc()
+            return None
+
+        try:
+            seq = int(line[1:space])
+            crc = int(line[star + 1:], 16)
+        except ValueError:
+            self._reject_crc()
+            return None
+
+        if crc8(line[:star].encode()) != crc:
+            self._reject_crc()
+            return None
+
+        if not self.synced:
+            self._refuse()
+            return None
+
+        delta = (seq - self.expected) % SEQ_MOD
+
+        if delta == 0:
+            self.expected = (self.expected + 1) % SEQ_MOD
+            self._ack_pending = True
+            self._nak_pending = False
+            self._last_nak = None
+            return line[space + 1:star]
+
+        if delta >= SEQ_MOD - SEQ_SPAN:
+            # Just behind us: retransmit of something already executed
+            self.duplicates += 1
+            self._ack_pending = True
+            return None
+
+        if delta < SEQ_SPAN:
+            # Just ahead of us: something in between was lost
+            self.seq_gaps += 1
+            self._request_resend()
+            return None
+
+        # Nowhere near us: the host is running a different sequence
+        self._refuse()
+        return None
+
+    def _sync(self, line):
+        try:
+            seq = int(line.split()[1]) % SEQ_MOD
+        except (IndexError, ValueError):
+            seq = 0
+
+        # Host just hasn't seen our ACKs yet: keep position, don't re-execute
+        if not self.synced or (self.expected - seq) % SEQ_MOD > SEQ_SPAN:
+            self.expected = seq
+
+        self.synced = True
+        self._ack_pending = False
+        self._nak_pending = False
+        self._nosync_pending = False
+        self._last_nak = None
+        self._sync_seq = self.expected
+        self._sync_pending = True
+
+    def _refuse(self):
+        self.out_of_sync += 1
+        self._nosync_pending = True
+
+    def _reject_crc(self):
+        self.crc_errors += 1
+        if self.stats is not None:
+            self.stats.parse_errors += 1
+        self._request_resend()
+
+    def _request_resend(self):
+        if not self.synced:
+            # No sequence to NAK against; tell the host to SYNC instead
+            self._nosync_pending = True
+            return
+        if self._last_nak is None or \
+                time.ticks_diff(time.ticks_ms(), self._last_nak) >= NAK_REPEAT_MS:
+            self._nak_pending = True
+
+    # ------------------------------------------------------------
+    # Reply path — called once per UART read, see header for what it sends
+    # ------------------------------------------------------------
+    def window(self, uart):
+        pending = uart.any() if hasattr(uart, "any") else 0
+        return max(self.rx_window - pending, 0)
+
+    def format_seq(self):
+        """Expected seq for the LINK record, or "-" while unsynced."""
+        return str(self.expected) if self.synced else "-"
+
+    def flush(self, uart):
+        reply = ""
+        if self._sync_pending:
+            # Expected seq as of the SYNC, even if frames followed it
+            reply = f"SYNC {self._sync_seq} {self.window(uart)}\r\n"
+
+        if self._nosync_pending:
+            reply += f"NOSYNC {self.window(uart)}\r\n"
+        elif self._nak_pending:
+            reply += f"NAK {self.expected} {self.window(uart)}\r\n"
+            self._last_nak = time.ticks_ms()
+        elif self._ack_pending:
+            last = (self.expected - 1) % SEQ_MOD
+            reply += f"ACK {last} {self.window(uart)}\r\n"
+
+        self._sync_pending = False
+        self._nosync_pending = False
+        self._nak_pending = False
+        self._ack_pending = False
+
+        if not reply:
+            return
+        if self.stats is not None:
+            self.stats.write(uart, reply)
+        else:
+            uart.write(reply)
@@ -1,4 +1,5 @@
 from encoder import SteeringEncoder, DrivingEncoder
+from response_curve import ResponseCurve
 import time
 
 class CommandParser:
@@ -7,6 +8,7 @@ class CommandParser:
                  right_encoder: DrivingEncoder | None = None,
                  steering_encoder: SteeringEncoder | None = None,
                  steering_target: float | None = None,
+                 stats=None,
                  verbose=True):
 
         self.uart = uart
@@ -28,14 +30,39 @@ class CommandParser:
         self.STEER_STALL_TIMEOUT_MS = 2000   # coast after 2 seconds of stall
         self.STEER_STALL_MIN_COUNTS = 2      # must move at least 2 counts to not be stalled
 
+        # Stick -> duty_u16 response curves (replaceable with CURVE over UART).
+        # Both match the original inline math to within table rounding.
+        # Drive: stop below 0.01, no rescale, full stick = minimum power.
+        # Steering: the original 0.6 + 0.2 * (0.95 - |x|) / 0.95 is linear,
+        # running from 0.789474 at |x| = 0.05 down to 0.589474 at full stick.
+        self.drive_curve = ResponseCurve(stop=0.01, deadband=0.0,
+                                         min_duty=0.01, max_duty=0.99,
+                                         invert=True, reverse=True)
+        self.steer_curve = ResponseCurve(deadband=0.05,
+                                         min_duty=0.589474, max_duty=0.789474,
+                                         reverse=True)
+
+        # Optional LinkStats for parse error / byte counters
+        self.stats = stats
+
         self.verbose = verbose
 
+    def _write(self, data):
+        if self.stats is not None:
+            self.stats.write(self.uart, data)
+        else:
+            self.uart.write(data)
+
+    def _parse_error(self, label, e):
+        if self.stats is not None:
+            self.stats.parse_errors += 1
+        print(label, e)
+
     # ---------------------------------------------------------
     # MAIN LINE PARSER
     # ---------------------------------------------------------
     def handle_line(self, line):
         #print("HANDLE:", line)
-        print("RUNTIME STEER MOTOR:", self.steering_motor.pin_in1, self.steering_motor.pin_in2)
 
         try:
             if isinstance(line, (bytes, bytearray)):
@@ -50,10 +77,18 @@ class CommandParser:
             cmd = parts[0].upper()
 
         except Exception as e:
-            print("Parser error:", e)
+            self._parse_error("Parser error:", e)
             return
 
-        if cmd == "PYTHON":
+        if cmd == "PING":
+            # First branch, and no debug print ahead of dispatch, so the
+            # reply timestamp is taken as close to RX as possible
+            try:
+                self.handle_ping(parts[1], parts[2])
+            except Exception as e:
+                self._parse_error("PING parse error:", e)
+
+        elif cmd == "PYTHON":
             raise KeyboardInterrupt
 
         elif cmd == "CMD":
@@ -63,22 +98,74 @@ class CommandParser:
                 self.update_driving_stick(linear)
                 self.update_steering_stick(angular)
             except Exception as e:
-                print("CMD parse error:", e)
+                self._parse_error("CMD parse error:", e)
 
         elif cmd == "PRNT":
             self.verbose = (parts[1].upper() == "ON")
 
+        elif cmd == "CURVE":
+            try:
+                self.handle_curve(parts[1].upper(), parts[2:])
+            except Exception as e:
+                self._parse_error("CURVE parse error:", e)
+
+        elif cmd == "BENCH":
+            try:
+                self.handle_bench(int(parts[1]) if len(parts) > 1 else 200)
+            except Exception as e:
+                self._parse_error("BENCH error:", e)
+
+    # ---------------------------------------------------------
+    # LATENCY PROBE
+    # ---------------------------------------------------------
+    def handle_ping(self, seq, host_ts):
+        # PING <seq> <host_ts>  ->  PONG <seq> <host_ts> <device ticks_us>
+        # host_ts is echoed untouched so the host can compute RTT and offset
+        now_us = time.ticks_us()
+        self._write(f"PONG {int(seq)} {host_ts} {now_us}\r\n")
+
+    # ---------------------------------------------------------
+    # RESPONSE CURVES
+    # ---------------------------------------------------------
+    def handle_curve(self, axis, params):
+        # CURVE <DRIVE|STEER> [stop= dead= expo= min= max= inv= rev=]
+        # Omitted keys keep their value; replies with the active curve.
+        if axis == "DRIVE":
+            curve = self.drive_curve
+        elif axis == "STEER":
+            curve = self.steer_curve
+        else:
+            raise ValueError("unknown axis: " + axis)
+
+        if params:
+            curve.configure(params)
+        self._write("CURVE " + axis + " " + curve.format() + "\r\n")
+
+    # ---------------------------------------------------------
+    # ON-DEVICE BENCHMARKS
+    # ---------------------------------------------------------
+    def handle_bench(self, iterations):
+        # Imported lazily: only needed when asked. Hardware cases are skipped
+        # so the real motors and encoder IRQs are never touched. Blocks the
+        # run loop while measuring — motors are coasted first.
+        import benchmarks
+
+        self.left_motor.coast()
+        self.right_motor.coast()
+        self.steering_motor.coast()
+
+        results = benchmarks.run(iterations=iterations, include_hardware=False)
+        for name in results:
+            self._write(benchmarks.format_result(name, results[name]))
+
     # ---------------------------------------------------------
     # STEERING PID (normalized)
     # ---------------------------------------------------------
     def update_steering_stick(self, x):
-        DEAD = 0.05
-        p_min = 0.60
-        p_max = 0.80
+        duty = self.steer_curve.lookup(x)
 
-        ax = abs(x)
-
-        if ax < DEAD:
+        # Deadband
+        if duty == 0:
             self.steering_motor.coast()
             self._steer_stall_start = None
             self._steer_last_encoder_pos = None
@@ -111,15 +198,8 @@ class CommandParser:
                         return
 
         # Normal drive
-        pwr = 1 - ax
-        t = (pwr - DEAD) / (1.0 - DEAD)
-        power = p_min + t * (p_max - p_min)
-
-        if x < 0:
-            power = -power
-
-        print("x:", x, "steering power:", power)
-        self.steering_motor.set_power(power)
+        print("x:", x, "steering duty:", duty)
+        self.steering_motor.set_duty(duty)
 
 
     def update_steering_pid(self):
@@ -181,34 +261,19 @@ class CommandParser:
     # ROS CMD_VEL HANDLER
     # ---------------------------------------------------------
     def update_driving_stick(self, linear):
-        # x in [-1, 1]
-        DEAD = 0.00
-        p_min = 0.01   # minimum effective PWM (motor starts moving)
-        p_max = 0.99   # safe max for rack
-    
-        x = linear
-        ax = abs(x)
+        # x in [-1, 1]; mapping lives in self.drive_curve
+        duty = self.drive_curve.lookup(linear)
 
         # Deadband
-        if ax < .01:
+        if duty == 0:
             self.left_motor.stop()
             self.right_motor.stop()
             return
-        
-        pwr = 1 - ax
-
-        # Map |x| from [DEAD, 1] -> [p_min, p_max]
-        t = (pwr - DEAD) / (1.0 - DEAD)
-        power = p_min + t * (p_max - p_min)
 
-        # Restore direction
-        if x > 0:
-            power = -power
+        print("x:", linear, "drive duty:", duty)
+        self.left_motor.set_duty(duty)
+        self.right_motor.set_duty(duty)
 
-        print("x:", x, "drive power:", power)
-        self.left_motor.set_power(power)
-        self.right_motor.set_power(power)
-    
 
     def handle_cmd_vel_pid(self, linear, angular):
         # Clamp inputs
@@ -274,6 +339,8 @@ class CommandParser:
         right_m = self.right_encoder.distance_m()
         steer_angle = self.steering_encoder.get_angle()  # normalized
 
-        uart.write(
-            f"ODOM {left_m:.5f} {right_m:.5f} {steer_angle:.3f}\r\n"
-        )
+        line = f"ODOM {left_m:.5f} {right_m:.5f} {steer_angle:.3f}\r\n"
+        if self.stats is not None:
+            self.stats.write(uart, line)
+        else:
+            uart.write(line)
@@ -1,22 +1,34 @@
 import time
-import uasyncio as asyncio
 from machine import UART, Pin
 
-from led_manager import LEDStatus, startup_blink, enter_error_mode
+from led_manager import (
+    LEDStatus, startup_blink, startup_blink_nonblocking, enter_error_mode,
+)
 from watchdog import Watchdog
 
 from encoder import DrivingEncoder, SteeringEncoder
 from gpio_helper_p2 import DRV8871
 from command_parser import CommandParser
+from link_stats import LinkStats
+from command_channel import CommandChannel
+
+# Fast boot: get the command loop live first, then finish non-critical init
+# (encoders, LED blinker task) from inside the loop. Set False for the old
+# fully-sequential startup with blocking blink and 200 ms settle.
+FAST_BOOT = True
 
 
 class ModeBlinker:
     def __init__(self, led, mode: str):
+        import uasyncio as asyncio   # deferred: only needed once we get here
+
         self.led = led
         self.mode = mode
         asyncio.create_task(self._loop())
 
     async def _loop(self):
+        import uasyncio as asyncio
+
         while True:
             if self.mode == "RUN":
                 self.led.on()
@@ -34,8 +46,27 @@ class ModeBlinker:
                 await asyncio.sleep(1.8)
 
 
+class BootTimeline:
+    """Records ticks_ms at each startup phase; ticks_ms starts at 0 on reset."""
+
+    def __init__(self):
+        self.phases = []
+        self.mark("main")
+
+    def mark(self, name):
+        self.phases.append((name, time.ticks_ms()))
+
+    def format(self):
+        return "BOOT " + " ".join(
+            "{}={}".format(name, t) for name, t in self.phases
+        ) + "\r\n"
+
+
+UART_RXBUF = 256  # advertised to the host as the command receive window
+
+
 def init_uart_for_run_mode():
-    return UART(0, baudrate=115200, tx=Pin(0), rx=Pin(1))
+    return UART(0, baudrate=115200, tx=Pin(0), rx=Pin(1), rxbuf=UART_RXBUF)
 
 
 def init_motors():
@@ -58,21 +89,33 @@ def init_led_and_watchdog():
     return led, watchdog
 
 
+def init_deferred(parser, led):
+    """Non-critical init: encoders for odometry/stall detection, LED task."""
+    print("MAIN: init_encoders\r\n")
+    steer_encoder, drive_left_encoder, drive_right_encoder = init_encoders()
+    parser.left_encoder = drive_left_encoder
+    parser.right_encoder = drive_right_encoder
+    parser.steering_encoder = steer_encoder
+    ModeBlinker(led, "RUN")
+
+
 def main():
+    boot = BootTimeline()
+
     uart = init_uart_for_run_mode()
     print("MAIN: entered main()\r\n")
+    boot.mark("uart")
 
     led, watchdog = init_led_and_watchdog()
-    startup_blink(led, "RUN")
-    ModeBlinker(led, "RUN")
+    if FAST_BOOT:
+        startup_blink_nonblocking(led, "RUN")
+    else:
+        startup_blink(led, "RUN")
 
     # Init motors
     print("MAIN: init_motors\r\n")
     steer_motor, drive_left, drive_right = init_motors()
-
-    # Init encoders
-    print("MAIN: init_encoders\r\n")
-    steer_encoder, drive_left_encoder, drive_right_encoder = init_encoders()
+    boot.mark("motors")
 
     # ---------------------------------------------------------
     # SMART AUTO-ZERO STEERING (TIMED, SAFE)
@@ -80,29 +123,42 @@ def main():
     drive_left.coast()
     drive_right.coast()
     steer_motor.coast()
-    time.sleep_ms(200)
+    if not FAST_BOOT:
+        time.sleep_ms(200)
 
-    initial_pos = steer_encoder.get_position()
     steering_target = 0.0
 
     # Start watchdog
     watchdog.start()
 
-    # Init parser
+    # Link-quality counters, reported as LINK records
+    stats = LinkStats(report_interval_ms=1000)
+
+    # Optional sequenced/checksummed command framing with ACK/NAK
+    channel = CommandChannel(rx_window=UART_RXBUF, stats=stats)
+
+    # Init parser (encoders attached by init_deferred)
     parser = CommandParser(
         uart=uart,
         left_motor=drive_left,
         right_motor=drive_right,
         steering_motor=steer_motor,
         watchdog=watchdog,
-        left_encoder=drive_left_encoder,
-        right_encoder=drive_right_encoder,
-        steering_encoder=steer_encoder,
         steering_target=steering_target,
+        stats=stats,
         verbose=True,
     )
+    boot.mark("parser")
+
+    deferred_pending = FAST_BOOT
+    if not FAST_BOOT:
+        init_deferred(parser, led)
+        boot.mark("deferred")
 
     print("MAIN: entering run loop")
+    if not FAST_BOOT:
+        boot.mark("loop")
+        stats.write(uart, boot.format())
 
     # ---------------------------------------------------------
     # INTEGRATED UART + HEARTBEAT + WATCHDOG LOOP
@@ -113,17 +169,23 @@ def main():
     last_odom = time.ticks_ms()
     TIMEOUT_MS = 2000
     ODOM_INTERVAL_MS = 100  # 10Hz
-    
+    RX_BUFFER_MAX = 512     # drop partial input beyond this (no newline seen)
+
     while True:
         # -----------------------------------------
         # UART READ (non-blocking, buffered)
         # -----------------------------------------
         data = uart.read()
         if data:
+            stats.bytes_in += len(data)
             try:
                 rx_buffer += data.decode()
             except UnicodeError:
-                pass
+                stats.parse_errors += 1
+
+            if len(rx_buffer) > RX_BUFFER_MAX and "\n" not in rx_buffer:
+                stats.overflow_drops += 1
+                rx_buffer = ""
 
             # Process complete lines
             while "\n" in rx_buffer:
@@ -133,15 +195,24 @@ def main():
                 if not line:
                     continue
 
+                stats.lines += 1
+
+                # Unwrap "@<seq> ...*<crc>" frames; None = consumed
+                line = channel.receive(line)
+                if line is None:
+                    continue
+
                 # -----------------------------------------
                 # HEARTBEAT
                 # -----------------------------------------
                 if line == "HB":
                     last_hb = time.ticks_ms()
+                    stats.heartbeat(last_hb)
                     continue
 
                 if line.startswith("CMD"):
                     last_hb = time.ticks_ms()
+                    stats.heartbeat(last_hb)
 
                 # -----------------------------------------
                 # COMMAND
@@ -150,13 +221,28 @@ def main():
                 try:
                     parser.handle_line(line)
                 except Exception as e:
+                    stats.parse_errors += 1
                     print("CMD parse error:", e)
 
+            # One cumulative ACK/NAK per read, not per line
+            channel.flush(uart)
+
+        # -----------------------------------------
+        # DEFERRED INIT (fast boot) — after the first UART poll
+        # -----------------------------------------
+        if deferred_pending:
+            boot.mark("loop")
+            init_deferred(parser, led)
+            boot.mark("deferred")
+            deferred_pending = False
+            stats.write(uart, boot.format())
+
         # -----------------------------------------
         # WATCHDOG TIMEOUT
         # -----------------------------------------
         if time.ticks_diff(time.ticks_ms(), last_hb) > TIMEOUT_MS:
             print("WATCHDOG TIMEOUT — stopping motors")
+            stats.watchdog_timeouts += 1
             steer_motor.coast()
             drive_left.coast()
             drive_right.coast()
@@ -176,4 +262,6 @@ def main():
                 print("ODOM error:", e)
             last_odom = time.ticks_ms()
 
+        stats.maybe_report(uart, channel)
+
         time.sleep_ms(10)
@@ -74,18 +74,25 @@ class DRV8871:
             self.coast()
             return
 
-        duty = int(abs(power) * 65535)
+        self.set_duty(int(power * 65535))
 
-        if power > 0:
+    # ------------------------------------------------------------
+    def set_duty(self, duty: int) -> None:
+        """Set signed duty in range [-65535, 65535]; 0 coasts."""
+        if duty == 0:
+            self.coast()
+            return
+
+        if duty > 0:
             # Forward: IN1 = HIGH, PWM on IN2
             Pin(self.pin_in1, Pin.OUT).high()
             Pin(self.pin_in2, Pin.OUT).low()
             self._attach_pwm(self.pin_in2)
-            self.pwm.duty_u16(duty)
+            self.pwm.duty_u16(min(duty, 65535))
 
         else:
             # Reverse: IN2 = HIGH, PWM on IN1
             Pin(self.pin_in2, Pin.OUT).high()
             Pin(self.pin_in1, Pin.OUT).low()
             self._attach_pwm(self.pin_in1)
-            self.pwm.duty_u16(duty)
+            self.pwm.duty_u16(min(-duty, 65535))
@@ -0,0 +1,32 @@
+"""
+Host-side (CPython) client for the Pico firmware UART protocol.
+
+    import asyncio
+    from pico_client import PicoClient, SerialTransport, Odom
+
+    async def run():
+        async with PicoClient(SerialTransport("/dev/ttyACM0"), sequenced=True) as pico:
+            await pico.send_cmd(0.4, 0.0)
+            print("rtt us:", await pico.ping())
+            async for rec in pico.telemetry():
+                if isinstance(rec, Odom):
+                    print(rec.left_m, rec.right_m, rec.steer)
+
+    asyncio.run(run())
+
+For testing without hardware, pass the master side of os.openpty() as
+SerialTransport(path, fd=master) and drive the slave side from a simulator
+(tests/pty_device.py is a minimal one).
+"""
+
+from .client import ClientStats, PicoClient
+from .protocol import (
+    Ack, Boot, Link, Nak, NoSync, Odom, Pong, Sync, Text, crc8, decode_line, frame,
+)
+from .transport import SerialTransport
+
+__all__ = [
+    "PicoClient", "ClientStats", "SerialTransport",
+    "Odom", "Pong", "Link", "Ack", "Nak", "Sync", "NoSync", "Boot", "Text",
+    "crc8", "frame", "decode_line",
+]
@@ -0,0 +1,420 @@
+# client.py
+#
+# asyncio client for the Pico firmware: heartbeats, CMD sending (plain or
+# sequenced with ACK/NAK flow control), PING latency probes and telemetry.
+#
+# Sequenced mode follows the recovery rules in command_channel.py: no framed
+# line goes out until the device has answered SYNC, and the client resyncs
+# on NOSYNC, BOOT, or an ACK/NAK/LINK seq outside its in-flight range. It
+# sends SYNC at its oldest unacked seq; the reply names the device's expected
+# seq, and the client releases frames before it (already executed) or, if it
+# is outside the in-flight range, renumbers its unacked frames from it.
+# Retransmit timeouts alone do not resync: a rebooted device answers every
+# retransmit with NOSYNC. Frames executed but not yet ACKed before a device
+# reboot are executed again after the resync.
+
+import asyncio
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+
+from .protocol import (
+    SEQ_MOD, Ack, Boot, Link, Nak, NoSync, Pong, Sync,
+    decode_line, encode_cmd, encode_ping, frame, plain, refreshes_heartbeat,
+)
+
+
+_EOF = object()   # telemetry queue sentinel: the port was closed
+
+
+def _now_us() -> int:
+    return time.monotonic_ns() // 1000
+
+
+@dataclass
+class ClientStats:
+    lines_in: int = 0
+    telemetry_dropped: int = 0   # records dropped because nobody consumed them
+    cmds_sent: int = 0
+    retransmits: int = 0
+    naks: int = 0
+    resyncs: int = 0
+    pings: int = 0
+    rtt_us_last: int | None = None
+    rtt_us_min: int | None = None
+    rtt_us_avg: float | None = None   # EWMA
+    clock_offset_us: float | None = None   # device ticks_us - host monotonic us
+    started: float = field(default_factory=time.monotonic)
+
+    def record_rtt(self, rtt_us: int, offset_us: float) -> None:
+        self.rtt_us_last = rtt_us
+        if self.rtt_us_min is None or rtt_us < self.rtt_us_min:
+            self.rtt_us_min = rtt_us
+            # min-RTT sample gives the least-skewed offset estimate
+            self.clock_offset_us = offset_us
+        if self.rtt_us_avg is None:
+            self.rtt_us_avg = float(rtt_us)
+        else:
+            self.rtt_us_avg += 0.125 * (rtt_us - self.rtt_us_avg)
+
+
+class PicoClient:
+    def __init__(self, transport, heartbeat_interval: float = 0.5,
+                 sequenced: bool = False, rto: float = 0.25,
+                 rx_window: int = 256, telemetry_queue: int = 256,
+                 sync_timeout: float = 2.0):
+        """
+        transport:          SerialTransport (opened by start() if needed)
+        heartbeat_interval: seconds between HB lines when no CMD was sent;
+                            keep well under the firmware's 2 s timeout
+        sequenced:          frame commands as @<seq> ...*<crc> and retransmit
+                            on NAK / timeout
+        rto:                retransmit timeout for unacked frames (seconds)
+        rx_window:          initial receive window until the device advertises one
+        sync_timeout:       seconds start() waits for the device to answer SYNC
+        """
+        self.transport = transport
+        self.heartbeat_interval = heartbeat_interval
+        self.sequenced = sequenced
+        self.rto = rto
+        self.sync_timeout = sync_timeout
+        self.stats = ClientStats()
+
+        self._queue = asyncio.Queue(maxsize=telemetry_queue)
+        self._tasks = []
+        self._closed = asyncio.Event()   # port hit EOF or close() was called
+        self._last_hb_refresh = 0.0   # last HB/CMD line; PING/SYNC don't count
+
+        # sequenced state
+        self._next_seq = 0
+        self._unacked = OrderedDict()   # seq -> (payload, framed bytes)
+        self._in_flight = 0
+        self._window = rx_window
+        self._window_open = asyncio.Event()
+        self._window_open.set()
+        self._last_progress = 0.0
+        self._synced = asyncio.Event()
+        self._syncing = False
+        self._sync_seq = 0
+        self._sync_sent = 0.0
+
+        # ping state
+        self._ping_seq = 0
+        self._pings = {}
+
+    # ------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------
+    async def start(self) -> None:
+        if not self.transport.is_open:
+            await self.transport.open()
+
+        # Reader must be running before SYNC so the reply is seen
+        self._tasks = [
+            asyncio.create_task(self._reader_loop()),
+            asyncio.create_task(self._heartbeat_loop()),
+        ]
+
+        if self.sequenced:
+            self._begin_sync()
+            try:
+                await asyncio.wait_for(self._wait(self._synced), self.sync_timeout)
+            except (asyncio.TimeoutError, ConnectionError):
+                await self.close()
+                raise
+
+    async def close(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self.transport.close()
+        self._disconnect()
+
+    def _disconnect(self) -> None:
+        """Fail waiting senders and pings, and end telemetry iterators."""
+        if self._closed.is_set():
+            return
+        self._closed.set()
+        for fut in self._pings.values():
+            if not fut.done():
+                fut.set_exception(ConnectionError("serial port closed"))
+        self._publish(_EOF)
+
+    async def _wait(self, event: asyncio.Event) -> None:
+        """Wait for event; raise ConnectionError if the port closes first."""
+        if not event.is_set() and not self._closed.is_set():
+            waiters = [asyncio.ensure_future(event.wait()),
+                       asyncio.ensure_future(self._closed.wait())]
+            try:
+                await asyncio.wait(waiters, return_when=asyncio.FIRST_COMPLETED)
+            finally:
+                for w in waiters:
+                    w.cancel()
+        if self._closed.is_set():
+            raise ConnectionError("serial port closed")
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    # ------------------------------------------------------------
+    # Sending
+    # ------------------------------------------------------------
+    def _write(self, data: bytes) -> None:
+        if self._closed.is_set():
+            raise ConnectionError("serial port closed")
+        self.transport.write(data)
+
+    async def send(self, payload: str) -> None:
+        """Send one command line, framed and flow-controlled if sequenced."""
+        if not self.sequenced:
+            self._write(plain(payload))
+            self._sent(payload)
+            return
+
+        while True:
+            await self._wait(self._synced)
+            data = frame(self._next_seq, payload)
+            if not self._unacked or self._in_flight + len(data) <= self._window:
+                break
+            self._window_open.clear()
+            await self._wait(self._window_open)
+
+        if not self._unacked:
+            self._last_progress = time.monotonic()
+
+        self._unacked[self._next_seq] = (payload, data)
+        self._in_flight += len(data)
+        self._next_seq = (self._next_seq + 1) % SEQ_MOD
+        self._write(data)
+        self._sent(payload)
+
+    def _sent(self, payload: str) -> None:
+        # Retransmits don't count: the device ignores duplicates
+        if refreshes_heartbeat(payload):
+            self._last_hb_refresh = time.monotonic()
+
+    async def send_cmd(self, linear: float, angular: float) -> None:
+        await self.send(encode_cmd(linear, angular))
+        self.stats.cmds_sent += 1
+
+    async def ping(self, timeout: float = 1.0) -> int:
+        """Round-trip a PING; returns RTT in microseconds."""
+        seq = self._ping_seq
+        self._ping_seq += 1
+        fut = asyncio.get_running_loop().create_future()
+        self._pings[seq] = fut
+        self.stats.pings += 1
+
+        # PING bypasses sequencing so a retransmit never skews the RTT
+        self._write(plain(encode_ping(seq, _now_us())))
+        try:
+            return await asyncio.wait_for(fut, timeout)
+        finally:
+            self._pings.pop(seq, None)
+
+    # ------------------------------------------------------------
+    # Receiving
+    # ------------------------------------------------------------
+    async def telemetry(self):
+        """
+        Async iterator over decoded telemetry (Odom, Link, Text).
+        Ends when the serial port reaches EOF or the client is closed.
+        """
+        while True:
+            rec = await self._queue.get()
+            if rec is _EOF:
+                self._queue.put_nowait(_EOF)   # end any other iterator too
+                return
+            yield rec
+
+    async def _reader_loop(self) -> None:
+        while True:
+            raw = await self.transport.readline()
+            if not raw:
+                self._disconnect()
+                return
+
+            line = raw.decode(errors="replace").strip()
+            if not line:
+                continue
+
+            self.stats.lines_in += 1
+            rec = decode_line(line)
+
+            if isinstance(rec, Ack):
+                self._on_ack(rec.seq, rec.window)
+            elif isinstance(rec, Nak):
+                self._on_nak(rec.seq, rec.window)
+            elif isinstance(rec, Sync):
+                self._on_sync(rec.seq, rec.window)
+            elif isinstance(rec, NoSync):
+                self._on_nosync()
+            elif isinstance(rec, Pong):
+                self._on_pong(rec)
+            else:
+                if isinstance(rec, Boot):
+                    self._on_boot()
+                elif isinstance(rec, Link):
+                    self._on_link(rec)
+                self._publish(rec)
+
+    def _publish(self, rec) -> None:
+        if self._queue.full():
+            self._queue.get_nowait()
+            self.stats.telemetry_dropped += 1
+        self._queue.put_nowait(rec)
+
+    # ------------------------------------------------------------
+    # Sequencing
+    # ------------------------------------------------------------
+    def _first_unacked(self) -> int:
+        return next(iter(self._unacked)) if self._unacked else self._next_seq
+
+    def _release(self, count: int) -> None:
+        """Drop the oldest count unacked frames (they were received)."""
+        for _ in range(count):
+            _, (_, data) = self._unacked.popitem(last=False)
+            self._in_flight -= len(data)
+        if count:
+            self._last_progress = time.monotonic()
+
+    def _on_ack(self, seq: int, window: int) -> None:
+        if not self.sequenced or not self._synced.is_set():
+            return
+        # Valid: from "nothing new" (first - 1) up to the newest frame sent
+        count = (seq - self._first_unacked() + 1) % SEQ_MOD
+        if count > len(self._unacked):
+            self._begin_sync()
+            return
+        self._release(count)
+        self._window = window
+        self._window_open.set()
+
+    def _on_nak(self, seq: int, window: int) -> None:
+        if not self.sequenced or not self._synced.is_set():
+            return
+        self.stats.naks += 1
+        # Valid: device expects one of our in-flight frames (or the next one)
+        count = (seq - self._first_unacked()) % SEQ_MOD
+        if count > len(self._unacked):
+            self._begin_sync()
+            return
+        self._release(count)
+        self._window = window
+        self._retransmit()
+        self._window_open.set()
+
+    def _on_sync(self, seq: int, window: int) -> None:
+        if not self._syncing:
+            return   # duplicate reply to a resent SYNC
+        self._syncing = False
+
+        count = (seq - self._first_unacked()) % SEQ_MOD
+        if count <= len(self._unacked):
+            self._release(count)
+        else:
+            self._renumber(seq)
+
+        self._window = window
+        self._synced.set()
+        self._retransmit()
+        self._window_open.set()
+
+    def _on_nosync(self) -> None:
+        if self.sequenced and not self._syncing:
+            self._begin_sync()
+
+    def _on_boot(self) -> None:
+        # Device rebooted: its sequence state is gone
+        if self.sequenced:
+            self._begin_sync()
+
+    def _on_link(self, rec: Link) -> None:
+        if not self.sequenced or not self._synced.is_set():
+            return
+        if rec.seq is None:
+            self._begin_sync()
+            return
+        # Device's expected seq must be one of ours in flight, or the next
+        # (an in-flight frame may simply not have arrived yet)
+        if (rec.seq - self._first_unacked()) % SEQ_MOD > len(self._unacked):
+            self._begin_sync()
+
+    def _begin_sync(self) -> None:
+        """SYNC the device to our oldest unacked frame; pause framed sends."""
+        if self._synced.is_set() or self._syncing:
+            self.stats.resyncs += 1
+        self._synced.clear()
+        self._syncing = True
+        self._sync_seq = self._first_unacked()
+        self._send_sync()
+
+    def _send_sync(self) -> None:
+        self._write(plain(f"SYNC {self._sync_seq}"))
+        self._sync_sent = time.monotonic()
+
+    def _renumber(self, base: int) -> None:
+        """Re-frame every unacked payload starting at seq base."""
+        payloads = [payload for payload, _ in self._unacked.values()]
+        self._unacked.clear()
+        self._in_flight = 0
+        self._next_seq = base
+        for payload in payloads:
+            data = frame(self._next_seq, payload)
+            self._unacked[self._next_seq] = (payload, data)
+            self._in_flight += len(data)
+            self._next_seq = (self._next_seq + 1) % SEQ_MOD
+
+    def _retransmit(self) -> None:
+        for _, data in self._unacked.values():
+            self._write(data)
+            self.stats.retransmits += 1
+        self._last_progress = time.monotonic()
+
+    def _on_pong(self, rec: Pong) -> None:
+        fut = self._pings.get(rec.seq)
+        rtt = _now_us() - rec.host_ts_us
+        offset = rec.device_us - (rec.host_ts_us + rtt / 2)
+        self.stats.record_rtt(rtt, offset)
+        if fut is not None and not fut.done():
+            fut.set_result(rtt)
+
+    # ------------------------------------------------------------
+    # Heartbeat + retransmit timer
+    # ------------------------------------------------------------
+    async def _heartbeat_loop(self) -> None:
+        tick = min(self.heartbeat_interval, self.rto) / 2
+        while True:
+            await asyncio.sleep(tick)
+            if self._closed.is_set():
+                return   # nothing to keep alive; _write would raise
+            now = time.monotonic()
+
+            # CMD lines also refresh the device heartbeat, so only fill gaps
+            if now - self._last_hb_refresh >= self.heartbeat_interval:
+                self._write(plain("HB"))
+                self._last_hb_refresh = now
+
+            if self._syncing:
+                if now - self._sync_sent >= self.rto:
+                    self._send_sync()
+            elif self._unacked and now - self._last_progress >= self.rto:
+                self._retransmit()
+
+    # ------------------------------------------------------------
+    # Counters
+    # ------------------------------------------------------------
+    def throughput(self) -> dict:
+        elapsed = max(time.monotonic() - self.stats.started, 1e-9)
+        t = self.transport
+        return {
+            "bytes_in_per_s": t.bytes_in / elapsed,
+            "bytes_out_per_s": t.bytes_out / elapsed,
+            "writes_per_s": t.writes / elapsed,
+            "cmds_per_s": self.stats.cmds_sent / elapsed,
+        }
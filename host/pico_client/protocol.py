@@ -0,0 +1,169 @@
+# protocol.py
+#
+# Host-side encoding/decoding of the firmware UART line protocol.
+# Mirrors command_parser.py, command_channel.py, link_stats.py and the BOOT
+# record in firmware.py on the device.
+
+from dataclasses import dataclass
+
+SEQ_MOD = 256
+
+
+def _make_crc8_table():
+    table = bytearray(256)
+    for i in range(256):
+        c = i
+        for _ in range(8):
+            if c & 0x80:
+                c = ((c << 1) ^ 0x07) & 0xFF
+            else:
+                c = (c << 1) & 0xFF
+        table[i] = c
+    return bytes(table)
+
+
+_CRC8_TABLE = _make_crc8_table()
+
+
+def crc8(data: bytes) -> int:
+    """CRC-8 (poly 0x07), same as command_channel.crc8 on the device."""
+    crc = 0
+    for b in data:
+        crc = _CRC8_TABLE[crc ^ b]
+    return crc
+
+
+# ---------------------------------------------------------
+# ENCODING (host -> device)
+# ---------------------------------------------------------
+def encode_cmd(linear: float, angular: float) -> str:
+    return f"CMD {linear:.3f} {angular:.3f}"
+
+
+def encode_ping(seq: int, host_ts_us: int) -> str:
+    return f"PING {seq} {host_ts_us}"
+
+
+def frame(seq: int, payload: str) -> bytes:
+    """Wrap a payload as "@<seq> <payload>*<crc>\\n"."""
+    body = f"@{seq % SEQ_MOD} {payload}"
+    return f"{body}*{crc8(body.encode()):02X}\n".encode()
+
+
+def plain(payload: str) -> bytes:
+    return f"{payload}\n".encode()
+
+
+def refreshes_heartbeat(payload: str) -> bool:
+    """True if the device resets its watchdog on this line (firmware.py)."""
+    return payload == "HB" or payload.startswith("CMD")
+
+
+# ---------------------------------------------------------
+# DECODED RECORDS (device -> host)
+# ---------------------------------------------------------
+@dataclass
+class Odom:
+    left_m: float
+    right_m: float
+    steer: float
+
+
+@dataclass
+class Pong:
+    seq: int
+    host_ts_us: int
+    device_us: int
+
+
+@dataclass
+class Link:
+    bytes_in: int
+    bytes_out: int
+    lines: int
+    parse_errors: int
+    overflow_drops: int
+    watchdog_timeouts: int
+    hb_gaps: list
+    seq: int | None = None   # device's expected seq; None if unsynced/absent
+
+
+@dataclass
+class Ack:
+    seq: int
+    window: int
+
+
+@dataclass
+class Nak:
+    seq: int
+    window: int
+
+
+@dataclass
+class Sync:
+    """Device accepted SYNC and now expects seq."""
+    seq: int
+    window: int
+
+
+@dataclass
+class NoSync:
+    """Device refused a framed line because it is not in sync."""
+    window: int
+
+
+@dataclass
+class Boot:
+    """Startup timeline: phase name -> ticks_ms. Device sequence state is reset."""
+    phases: dict
+
+
+@dataclass
+class Text:
+    """Any line the client does not decode (debug prints, CURVE, ...)."""
+    line: str
+
+
+def _link_fields(parts):
+    fields = dict(p.split("=", 1) for p in parts[1:])
+    return Link(
+        bytes_in=int(fields["in"]),
+        bytes_out=int(fields["out"]),
+        lines=int(fields["lines"]),
+        parse_errors=int(fields["perr"]),
+        overflow_drops=int(fields["drop"]),
+        watchdog_timeouts=int(fields["wdt"]),
+        hb_gaps=[int(n) for n in fields["hb"].split(",")],
+        seq=int(fields["seq"]) if fields.get("seq", "-") != "-" else None,
+    )
+
+
+def decode_line(line: str):
+    """Decode one stripped line into a record; unknown lines become Text."""
+    parts = line.split()
+    if not parts:
+        return Text(line)
+
+    tag = parts[0]
+    try:
+        if tag == "ODOM":
+            return Odom(float(parts[1]), float(parts[2]), float(parts[3]))
+        if tag == "PONG":
+            return Pong(int(parts[1]), int(parts[2]), int(parts[3]))
+        if tag == "ACK":
+            return Ack(int(parts[1]), int(parts[2]))
+        if tag == "NAK":
+            return Nak(int(parts[1]), int(parts[2]))
+        if tag == "SYNC":
+            return Sync(int(parts[1]), int(parts[2]))
+        if tag == "NOSYNC":
+            return NoSync(int(parts[1]))
+        if tag == "LINK":
+            return _link_fields(parts)
+        if tag == "BOOT":
+            return Boot({k: int(v) for k, v in (p.split("=", 1) for p in parts[1:])})
+    except (IndexError, ValueError, KeyError):
+        pass
+
+    return Text(line)
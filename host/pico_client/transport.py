@@ -0,0 +1,133 @@
+# transport.py
+#
+# Non-blocking asyncio transport over a serial device or pty file descriptor.
+# No pyserial needed: the fd is put in raw mode with termios and driven by
+# loop.add_reader / loop.add_writer, so reads never block the event loop.
+
+import asyncio
+import os
+import termios
+import tty
+
+_BAUD = {
+    9600: termios.B9600,
+    19200: termios.B19200,
+    38400: termios.B38400,
+    57600: termios.B57600,
+    115200: termios.B115200,
+}
+
+
+class SerialTransport:
+    def __init__(self, path: str, baudrate: int = 115200, fd: int | None = None):
+        """
+        path: /dev/ttyACM0, /dev/ttyUSB0, a pty slave path, ...
+        fd:   already-open descriptor (e.g. from os.openpty()); path is then
+              only used for display.
+        """
+        self.path = path
+        self.baudrate = baudrate
+        self.fd = fd
+
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.writes = 0   # os.write() calls, i.e. batches actually sent
+
+        self._loop = None
+        self._reader = None
+        self._wbuf = bytearray()
+        self._writing = False
+        self._drained = None
+
+    # ------------------------------------------------------------
+    @property
+    def is_open(self) -> bool:
+        return self._reader is not None and self.fd is not None
+
+    async def open(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        if self.fd is None:
+            self.fd = os.open(self.path, os.O_RDWR | os.O_NOCTTY | os.O_NONBLOCK)
+        else:
+            os.set_blocking(self.fd, False)
+
+        if os.isatty(self.fd):
+            self._configure_tty()
+
+        self._reader = asyncio.StreamReader()
+        self._drained = asyncio.Event()
+        self._drained.set()
+        self._loop.add_reader(self.fd, self._on_readable)
+
+    def _configure_tty(self) -> None:
+        tty.setraw(self.fd)
+        attrs = termios.tcgetattr(self.fd)
+        speed = _BAUD.get(self.baudrate)
+        if speed is not None:
+            attrs[4] = speed   # ispeed
+            attrs[5] = speed   # ospeed
+        termios.tcsetattr(self.fd, termios.TCSANOW, attrs)
+
+    def close(self) -> None:
+        if self.fd is None:
+            return
+        if self._loop is not None:
+            self._loop.remove_reader(self.fd)
+            if self._writing:
+                self._loop.remove_writer(self.fd)
+        os.close(self.fd)
+        self.fd = None
+        if self._reader is not None:
+            self._reader.feed_eof()
+
+    # ------------------------------------------------------------
+    # Read path
+    # ------------------------------------------------------------
+    def _on_readable(self) -> None:
+        try:
+            data = os.read(self.fd, 4096)
+        except BlockingIOError:
+            return
+        except OSError:
+            # pty master raises EIO once the slave side is closed
+            data = b""
+
+        if not data:
+            self._loop.remove_reader(self.fd)
+            self._reader.feed_eof()
+            return
+
+        self.bytes_in += len(data)
+        self._reader.feed_data(data)
+
+    async def readline(self) -> bytes:
+        """Return one line including b"\\n", or b"" at EOF."""
+        return await self._reader.readline()
+
+    # ------------------------------------------------------------
+    # Write path — everything written in one loop tick goes out together
+    # ------------------------------------------------------------
+    def write(self, data: bytes) -> None:
+        self._wbuf += data
+        if not self._writing:
+            self._writing = True
+            self._drained.clear()
+            self._loop.add_writer(self.fd, self._on_writable)
+
+    def _on_writable(self) -> None:
+        try:
+            n = os.write(self.fd, self._wbuf)
+        except BlockingIOError:
+            return
+
+        self.writes += 1
+        self.bytes_out += n
+        del self._wbuf[:n]
+
+        if not self._wbuf:
+            self._loop.remove_writer(self.fd)
+            self._writing = False
+            self._drained.set()
+
+    async def drain(self) -> None:
+        await self._drained.wait()
@@ -27,10 +27,28 @@ class LEDStatus:
     def set_error(self):
         self.mode = "error"
 
+    def start_blink(self, count, interval_ms):
+        """Non-blocking blink pattern driven by update(); then heartbeat."""
+        self.mode = "startup"
+        self._blinks_left = count * 2   # on + off per blink
+        self._blink_interval = interval_ms
+        self.on()
+        self._blinks_left -= 1
+        self.last_toggle = time.ticks_ms()
+
     def update(self):
         now = time.ticks_ms()
 
-        if self.mode == "heartbeat":
+        if self.mode == "startup":
+            if time.ticks_diff(now, self.last_toggle) >= self._blink_interval:
+                self.toggle()
+                self.last_toggle = now
+                self._blinks_left -= 1
+                if self._blinks_left <= 0:
+                    self.off()
+                    self.mode = "heartbeat"
+
+        elif self.mode == "heartbeat":
             if time.ticks_diff(now, self.last_toggle) > 500:
                 self.toggle()
                 self.last_toggle = now
@@ -72,5 +90,13 @@ def startup_blink(led: LEDStatus, mode: str):
             time.sleep(0.1)
 
 
+def startup_blink_nonblocking(led: LEDStatus, mode: str):
+    # Same pattern as startup_blink(), played out by led.update() in the run loop
+    if mode == "DEBUG":
+        led.start_blink(2, 200)
+    else:
+        led.start_blink(3, 100)
+
+
 def enter_error_mode(led: LEDStatus):
     led.set_error()
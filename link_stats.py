@@ -0,0 +1,73 @@
+# link_stats.py
+
+import time
+
+# Heartbeat gap histogram bucket upper bounds (ms); last bucket is "above"
+HB_GAP_BUCKETS_MS = (50, 100, 250, 500, 1000, 2000)
+
+
+class LinkStats:
+    def __init__(self, report_interval_ms=1000):
+        self.report_interval_ms = report_interval_ms
+        self.last_report = time.ticks_ms()
+        self._last_hb = None
+        self.clear()
+
+    def clear(self):
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.lines = 0
+        self.parse_errors = 0
+        self.overflow_drops = 0
+        self.watchdog_timeouts = 0
+        self.hb_gaps = [0] * (len(HB_GAP_BUCKETS_MS) + 1)
+
+    # ------------------------------------------------------------
+    # Counters
+    # ------------------------------------------------------------
+    def heartbeat(self, now=None):
+        """Record a heartbeat and bin the gap since the previous one."""
+        if now is None:
+            now = time.ticks_ms()
+
+        if self._last_hb is not None:
+            gap = time.ticks_diff(now, self._last_hb)
+            i = 0
+            for bound in HB_GAP_BUCKETS_MS:
+                if gap <= bound:
+                    break
+                i += 1
+            self.hb_gaps[i] += 1
+
+        self._last_hb = now
+
+    def write(self, uart, data):
+        """Write to the UART and count outgoing bytes."""
+        if isinstance(data, str):
+            data = data.encode()
+        uart.write(data)
+        self.bytes_out += len(data)
+
+    # ------------------------------------------------------------
+    # Periodic report
+    # ------------------------------------------------------------
+    def format(self, channel=None):
+        line = "LINK in={} out={} lines={} perr={} drop={} wdt={} hb={}".format(
+            self.bytes_in, self.bytes_out, self.lines, self.parse_errors,
+            self.overflow_drops, self.watchdog_timeouts,
+            ",".join(str(n) for n in self.hb_gaps),
+        )
+        if channel is not None:
+            line += " seq=" + channel.format_seq()
+        return line + "\r\n"
+
+    def maybe_report(self, uart, channel=None):
+        """
+        Emit a LINK record every report_interval_ms. Counters are cumulative.
+        With a CommandChannel, the record also carries its expected seq.
+        """
+        now = time.ticks_ms()
+        if time.ticks_diff(now, self.last_report) < self.report_interval_ms:
+            return
+        self.last_report = now
+        self.write(uart, self.format(channel))
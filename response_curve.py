@@ -0,0 +1,151 @@
+# response_curve.py
+#
+# Stick -> motor duty mapping, precomputed into a small integer table.
+# Curve math happens only when a curve is (re)built; each update is one
+# float multiply to quantize the stick, then integer index + interpolation.
+
+from micropython import const
+
+DUTY_MAX = const(65535)
+
+# const() lets MicroPython inline these into lookup() at compile time
+INPUT_SHIFT = const(10)                    # deadband..1 quantized to 0..1024
+INPUT_SCALE = const(1 << INPUT_SHIFT)
+TABLE_SHIFT = const(5)                     # 32 segments, 34 table entries
+TABLE_SIZE = const(1 << TABLE_SHIFT)
+FRAC_SHIFT = const(INPUT_SHIFT - TABLE_SHIFT)
+FRAC_MASK = const((1 << FRAC_SHIFT) - 1)
+
+_FLAG_VALUES = {
+    "1": True, "on": True, "true": True,
+    "0": False, "off": False, "false": False,
+}
+
+
+def _flag(value):
+    # Strict: a typo must not silently reverse a motor
+    try:
+        return _FLAG_VALUES[value.lower()]
+    except KeyError:
+        raise ValueError("bad flag value: " + value)
+
+
+def _stop(value):
+    # "-" = follow the deadband
+    return None if value == "-" else float(value)
+
+
+_CONFIG_KEYS = {
+    "stop": ("stop", _stop),
+    "dead": ("deadband", float),
+    "expo": ("expo", float),
+    "min": ("min_duty", float),
+    "max": ("max_duty", float),
+    "inv": ("invert", _flag),
+    "rev": ("reverse", _flag),
+}
+
+
+class ResponseCurve:
+    def __init__(self, deadband=0.0, expo=0.0, min_duty=0.0, max_duty=1.0,
+                 invert=False, reverse=False, stop=None):
+        """
+        stop:      |x| below this returns 0 (caller stops/coasts);
+                   None = follow deadband, also after it is reconfigured
+        deadband:  start of the input range that is mapped onto min..max
+        expo:      0 = linear, 1 = cubic (finer control near center)
+        min_duty:  output fraction just outside the deadband
+        max_duty:  output fraction at full stick
+        invert:    flip output sign (motor wired/mounted backwards)
+        reverse:   map full stick to min_duty instead of max_duty
+        """
+        self.stop = stop
+        self.deadband = deadband
+        self.expo = expo
+        self.min_duty = min_duty
+        self.max_duty = max_duty
+        self.invert = invert
+        self.reverse = reverse
+        self.build()
+
+    def build(self):
+        """Recompute the lookup table from the current parameters."""
+        self._stop = self.deadband if self.stop is None else self.stop
+        self._neg_stop = -self._stop
+
+        dead = min(max(self.deadband, 0.0), 0.99)
+        expo = min(max(self.expo, 0.0), 1.0)
+        lo = int(min(max(self.min_duty, 0.0), 1.0) * DUTY_MAX)
+        hi = int(min(max(self.max_duty, 0.0), 1.0) * DUTY_MAX)
+
+        # The table spans deadband..1 rather than 0..1 so the deadband edge
+        # falls on a table point; interpolating across it would cut the corner
+        self._scale = INPUT_SCALE / (1.0 - dead)
+        self._offset = int(dead * self._scale)
+        self._neg_offset = -self._offset
+
+        # TABLE_SIZE + 1 points, plus one so index TABLE_SIZE (|x| == 1.0)
+        # can read t[i + 1] in lookup()
+        table = []
+        for i in range(TABLE_SIZE + 2):
+            u = min(i / TABLE_SIZE, 1.0)
+            if self.reverse:
+                u = 1.0 - u
+            u = (1.0 - expo) * u + expo * u * u * u
+            table.append(lo + int(u * (hi - lo)))
+
+        self._table = table
+
+    def lookup(self, x):
+        """Signed duty_u16 for x in [-1, 1]; 0 below the stop threshold."""
+        # Compare before quantizing so the threshold is exact
+        if self._neg_stop < x < self._stop or x == 0:
+            return 0
+
+        # x * _scale is the only float op per call (one boxed float on
+        # MicroPython); int() truncates toward zero, so negate via the offset
+        if x < 0:
+            q = self._neg_offset - int(x * self._scale)
+            neg = not self.invert
+        else:
+            q = int(x * self._scale) - self._offset
+            neg = self.invert
+
+        if q < 0:
+            q = 0   # stop below the deadband: hold the deadband-edge duty
+        elif q > INPUT_SCALE:
+            q = INPUT_SCALE
+
+        t = self._table
+        i = q >> FRAC_SHIFT
+        q &= FRAC_MASK   # position within the segment
+        a = t[i]
+        duty = a + (((t[i + 1] - a) * q) >> FRAC_SHIFT)
+        return -duty if neg else duty
+
+    # ------------------------------------------------------------
+    # UART config: "stop=0.05 dead=0.05 expo=0.3 min=0.6 max=0.8 inv=0 rev=1"
+    # Flags accept 1/0/on/off/true/false, case-insensitive; stop=- follows dead
+    # ------------------------------------------------------------
+    def configure(self, params):
+        """Apply key=value tokens and rebuild; nothing changes if any is bad."""
+        updates = {}
+        for token in params:
+            key, value = token.split("=", 1)
+            key = key.lower()
+            if key not in _CONFIG_KEYS:
+                raise ValueError("unknown curve key: " + key)
+            attr, conv = _CONFIG_KEYS[key]
+            updates[attr] = conv(value)
+
+        for attr in updates:
+            setattr(self, attr, updates[attr])
+        self.build()
+
+    def format(self):
+        stop = "-" if self.stop is None else "{:.3f}".format(self.stop)
+        return ("stop={} dead={:.3f} expo={:.3f} min={:.3f} max={:.3f} "
+                "inv={} rev={}").format(
+            stop, self.deadband, self.expo, self.min_duty, self.max_duty,
+            int(self.invert), int(self.reverse),
+        )
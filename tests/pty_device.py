@@ -0,0 +1,70 @@
+# pty_device.py
+#
+# Minimal stand-in for the firmware run loop on the slave side of a pty:
+# lines go through a real CommandChannel, executed payloads are recorded.
+
+import asyncio
+import os
+import tty
+
+from command_channel import CommandChannel
+
+
+class _FdUART:
+    def __init__(self, fd):
+        self.fd = fd
+
+    def write(self, data):
+        if isinstance(data, str):
+            data = data.encode()
+        os.write(self.fd, data)
+
+    def any(self):
+        return 0
+
+
+class PtyDevice:
+    def __init__(self, fd):
+        self.fd = fd
+        tty.setraw(fd)
+        os.set_blocking(fd, False)
+        self.uart = _FdUART(fd)
+        self.channel = CommandChannel()
+        self.executed = []
+        self.drop = None   # predicate(line) -> True to lose an incoming line
+        self._buf = b""
+
+    def reboot(self):
+        """Forget all channel state, as a brown-out reset would."""
+        self.channel = CommandChannel()
+        self._buf = b""
+        self.uart.write("BOOT main=0 loop=5\r\n")
+
+    def poll(self):
+        try:
+            self._buf += os.read(self.fd, 4096)
+        except BlockingIOError:
+            pass
+
+        while b"\n" in self._buf:
+            raw, self._buf = self._buf.split(b"\n", 1)
+            line = raw.decode().strip()
+            if not line:
+                continue
+            if self.drop is not None and self.drop(line):
+                continue
+            payload = self.channel.receive(line)
+            if payload is None or payload == "HB":
+                continue
+            if payload.startswith("PING"):
+                _, seq, host_ts = payload.split()
+                self.uart.write(f"PONG {seq} {host_ts} 0\r\n")
+                continue
+            self.executed.append(payload)
+
+        self.channel.flush(self.uart)
+
+    async def run(self, period=0.005):
+        while True:
+            self.poll()
+            await asyncio.sleep(period)
@@ -0,0 +1,150 @@
+import asyncio
+import os
+
+import pytest
+
+from pico_client import PicoClient, SerialTransport
+from pty_device import PtyDevice
+
+
+async def _session(scenario):
+    master, slave = os.openpty()
+    device = PtyDevice(slave)
+    device_task = asyncio.create_task(device.run())
+    client = PicoClient(SerialTransport("pty", fd=master), sequenced=True,
+                        rto=0.05, sync_timeout=1.0)
+    try:
+        await scenario(client, device)
+    finally:
+        await client.close()
+        device_task.cancel()
+        os.close(slave)
+
+
+async def _settle(client, timeout=2.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while client._unacked or not client._synced.is_set():
+        assert asyncio.get_running_loop().time() < deadline, "client never settled"
+        await asyncio.sleep(0.01)
+
+
+def _cmds(start, stop):
+    return [f"CMD 0.{i:03d} 0.000" for i in range(start, stop)]
+
+
+def test_lost_sync_at_start_is_retried():
+    async def scenario(client, device):
+        lost = []
+        device.drop = lambda line: line.startswith("SYNC") and not lost.append(line)
+        task = asyncio.create_task(client.start())
+        await asyncio.sleep(0.02)
+        device.drop = None
+        await task
+
+        await client.send_cmd(0.001, 0.0)
+        await _settle(client)
+        assert lost
+        assert device.executed == ["CMD 0.001 0.000"]
+
+    asyncio.run(_session(scenario))
+
+
+def test_device_reboot_mid_session_recovers():
+    async def scenario(client, device):
+        await client.start()
+        for i in range(10):
+            await client.send_cmd(i / 1000, 0.0)
+        await _settle(client)
+
+        device.reboot()
+        for i in range(10, 20):
+            await asyncio.wait_for(client.send_cmd(i / 1000, 0.0), 2.0)
+        await _settle(client)
+
+        assert device.executed == _cmds(0, 20)
+        assert client.stats.resyncs >= 1
+
+    asyncio.run(_session(scenario))
+
+
+def test_ack_outside_in_flight_range_does_not_drop_frames():
+    async def scenario(client, device):
+        await client.start()
+        # Device stops answering, then a bogus ACK arrives for an unrelated seq
+        device.drop = lambda line: line.startswith("@")
+        for i in range(3):
+            await client.send_cmd(i / 1000, 0.0)
+        client._on_ack(200, 256)
+        assert len(client._unacked) == 3
+        assert client.stats.resyncs == 1
+
+        device.drop = None
+        await _settle(client)
+        assert device.executed == _cmds(0, 3)
+
+    asyncio.run(_session(scenario))
+
+
+def test_host_restart_adopts_device_sequence():
+    async def scenario(client, device):
+        # Device still synced from a previous host session
+        device.channel.receive("SYNC 5")
+        await client.start()
+        for i in range(3):
+            await client.send_cmd(i / 1000, 0.0)
+        await _settle(client)
+
+        assert device.executed == _cmds(0, 3)
+        assert client._next_seq == 8
+
+    asyncio.run(_session(scenario))
+
+
+def test_pings_do_not_suppress_heartbeat():
+    async def scenario(client, device):
+        seen = []
+        device.drop = lambda line: seen.append(line)   # observe, never drop
+        await client.start()
+        await client.send_cmd(0.0, 0.0)
+
+        # Only latency probes for 1.2 s: HB must still go out every 0.5 s
+        for _ in range(6):
+            await client.ping()
+            await asyncio.sleep(0.2)
+
+        assert seen.count("HB") >= 2
+
+    asyncio.run(_session(scenario))
+
+
+def test_eof_ends_telemetry_and_fails_waiters():
+    async def scenario():
+        master, slave = os.openpty()
+        client = PicoClient(SerialTransport("pty", fd=master), sequenced=True,
+                            sync_timeout=5.0)
+        records = []
+
+        async def consume():
+            async for rec in client.telemetry():
+                records.append(rec)
+
+        # Nobody answers SYNC, so start() and send() are both waiting
+        starting = asyncio.create_task(client.start())
+        await asyncio.sleep(0.05)
+        sending = asyncio.create_task(client.send_cmd(0.1, 0.0))
+        consumer = asyncio.create_task(consume())
+        os.write(slave, b"hello\r\n")
+        await asyncio.sleep(0.05)
+
+        os.close(slave)   # the pty master now reads EOF
+
+        await asyncio.wait_for(consumer, 1.0)
+        assert [r.line for r in records] == ["hello"]
+        for task in (starting, sending):
+            with pytest.raises(ConnectionError):
+                await asyncio.wait_for(task, 1.0)
+        with pytest.raises(ConnectionError):
+            await client.send_cmd(0.2, 0.0)
+        await client.close()
+
+    asyncio.run(scenario())
@@ -0,0 +1,141 @@
+import asyncio
+import os
+import tty
+
+from command_channel import CommandChannel, crc8
+from pty_device import PtyDevice
+
+
+def frame(seq, payload):
+    body = f"@{seq} {payload}"
+    return f"{body}*{crc8(body.encode()):02X}\n".encode()
+
+
+class _Host:
+    """Scripted host on the master side of the pty."""
+
+    def __init__(self, fd):
+        self.fd = fd
+        tty.setraw(fd)
+        os.set_blocking(fd, False)
+        self._buf = b""
+
+    def send(self, data):
+        os.write(self.fd, data)
+
+    async def replies(self, device, wait=0.05):
+        await asyncio.sleep(wait)
+        device.poll()
+        await asyncio.sleep(wait)
+        try:
+            self._buf += os.read(self.fd, 4096)
+        except BlockingIOError:
+            pass
+        lines = self._buf.decode().split("\r\n")
+        self._buf = lines.pop().encode()
+        return lines
+
+
+def test_unsynced_frames_are_refused():
+    ch = CommandChannel()
+    assert ch.receive(frame(0, "CMD 0.1 0.0").decode().strip()) is None
+    assert ch.out_of_sync == 1
+    assert ch.format_seq() == "-"
+
+
+def test_far_out_of_step_frame_is_refused_not_acked():
+    ch = CommandChannel()
+    ch.receive("SYNC 100")
+    assert ch.receive(frame(0, "CMD 0.1 0.0").decode().strip()) is None
+    assert ch.duplicates == 0
+    assert ch.out_of_sync == 1
+
+
+def test_reboot_and_lost_sync_recover():
+    async def scenario():
+        master, slave = os.openpty()
+        device = PtyDevice(slave)
+        host = _Host(master)
+
+        host.send(b"SYNC 0\n")
+        assert "SYNC 0 256" in await host.replies(device)
+
+        for seq in range(3):
+            host.send(frame(seq, f"CMD 0.{seq} 0.0"))
+        assert "ACK 2 256" in await host.replies(device)
+
+        # Brown-out: channel state is gone and the device announces BOOT
+        device.reboot()
+        host.send(frame(3, "CMD 0.3 0.0"))
+        replies = await host.replies(device)
+        assert replies[0].startswith("BOOT")
+        assert "NOSYNC 256" in replies
+
+        # The host's SYNC is lost on the wire: still refused, never executed
+        device.drop = lambda line: line.startswith("SYNC")
+        host.send(b"SYNC 3\n")
+        host.send(frame(3, "CMD 0.3 0.0"))
+        assert "NOSYNC 256" in await host.replies(device)
+
+        # SYNC gets through on retry; the unacked frame is then executed
+        device.drop = None
+        host.send(b"SYNC 3\n")
+        assert "SYNC 3 256" in await host.replies(device)
+        host.send(frame(3, "CMD 0.3 0.0"))
+        assert "ACK 3 256" in await host.replies(device)
+
+        assert device.executed == [
+            "CMD 0.0 0.0", "CMD 0.1 0.0", "CMD 0.2 0.0", "CMD 0.3 0.0",
+        ]
+        os.close(master)
+        os.close(slave)
+
+    asyncio.run(scenario())
+
+
+def test_nak_repeats_while_gap_persists():
+    ch = CommandChannel()
+    ch.receive("SYNC 0")
+
+    class Sink:
+        def __init__(self):
+            self.out = []
+
+        def write(self, data):
+            self.out.append(data)
+
+    sink = Sink()
+    ch.flush(sink)
+    ch.receive(frame(1, "HB").decode().strip())
+    ch.flush(sink)
+    ch._last_nak -= 1000   # pretend NAK_REPEAT_MS has passed
+    ch.receive(frame(2, "HB").decode().strip())
+    ch.flush(sink)
+    assert sink.out == ["SYNC 0 256\r\n", "NAK 0 256\r\n", "NAK 0 256\r\n"]
+
+
+def test_sync_behind_expected_keeps_position():
+    ch = CommandChannel()
+    ch.receive("SYNC 0")
+    for seq in range(3):
+        assert ch.receive(frame(seq, "HB").decode().strip()) == "HB"
+
+    # Host resyncs at its oldest unacked frame, which was already executed
+    ch.receive("SYNC 1")
+    assert ch.expected == 3
+    assert ch.receive(frame(1, "HB").decode().strip()) is None
+    assert ch.duplicates == 1
+
+    # Far away: the host is on a new sequence, so follow it
+    ch.receive("SYNC 100")
+    assert ch.expected == 100
+
+
+def test_sync_matches_whole_token_any_case():
+    ch = CommandChannel()
+    assert ch.receive("SYNCHRONIZE 5") == "SYNCHRONIZE 5"
+    assert not ch.synced
+
+    assert ch.receive("sync 5") is None
+    assert ch.synced
+    assert ch.expected == 5
@@ -0,0 +1,50 @@
+from command_parser import CommandParser
+from link_stats import HB_GAP_BUCKETS_MS, LinkStats
+
+
+class _Sink:
+    def __init__(self):
+        self.out = []
+
+    def write(self, data):
+        self.out.append(data)
+
+
+def test_ping_echoes_seq_and_host_ts():
+    uart = _Sink()
+    parser = CommandParser(uart, None, None, None, None)
+    parser.handle_line("PING 7 1234567890123")
+
+    assert len(uart.out) == 1
+    reply = uart.out[0]
+    assert reply.endswith("\r\n")
+    word, seq, host_ts, device_us = reply.split()
+    assert (word, seq, host_ts) == ("PONG", "7", "1234567890123")
+    int(device_us)
+
+
+def test_ping_reply_is_counted_by_stats():
+    uart = _Sink()
+    stats = LinkStats()
+    parser = CommandParser(uart, None, None, None, None, stats=stats)
+    parser.handle_line("PING 1 42")
+    assert stats.bytes_out == len(uart.out[0])
+
+
+def test_heartbeat_gap_bucket_edges():
+    stats = LinkStats()
+    t = 1000
+    stats.heartbeat(t)
+    for gap in (50, 51, 2000, 2001, 5000):
+        t += gap
+        stats.heartbeat(t)
+
+    # Bounds are inclusive; anything over the last bound lands in "above"
+    assert len(stats.hb_gaps) == len(HB_GAP_BUCKETS_MS) + 1
+    assert stats.hb_gaps == [1, 1, 0, 0, 0, 1, 2]
+
+
+def test_first_heartbeat_records_no_gap():
+    stats = LinkStats()
+    stats.heartbeat(1000)
+    assert sum(stats.hb_gaps) == 0
@@ -0,0 +1,98 @@
+import pytest
+
+from command_parser import CommandParser
+from response_curve import ResponseCurve
+
+
+def _legacy_drive(x):
+    # update_driving_stick() before the lookup table
+    ax = abs(x)
+    if ax < .01:
+        return 0
+    power = 0.01 + (1 - ax) * 0.98
+    return int((-power if x > 0 else power) * 65535)
+
+
+def _legacy_steer(x):
+    # update_steering_stick() before the lookup table
+    ax = abs(x)
+    if ax < 0.05:
+        return 0
+    power = 0.60 + (1 - ax - 0.05) / (1.0 - 0.05) * (0.80 - 0.60)
+    return int((-power if x < 0 else power) * 65535)
+
+
+def _drive_curve():
+    parser = CommandParser(None, None, None, None, None)
+    return parser.drive_curve
+
+
+def test_default_drive_curve_matches_original_mapping():
+    curve = _drive_curve()
+    for k in range(-1000, 1001):
+        x = k / 1000
+        # |x| is quantized to 1/1024: at most ~62 counts (0.1% duty) apart
+        assert abs(curve.lookup(x) - _legacy_drive(x)) <= 64, x
+
+
+def test_default_steer_curve_matches_original_mapping():
+    curve = CommandParser(None, None, None, None, None).steer_curve
+    for k in range(-1000, 1001):
+        x = k / 1000
+        # Same quantization bound as drive, over a 0.2 duty span
+        assert abs(curve.lookup(x) - _legacy_steer(x)) <= 16, x
+
+
+def test_stop_threshold_is_exact():
+    curve = _drive_curve()
+    assert curve.lookup(0.0099) == 0
+    assert curve.lookup(-0.0099) == 0
+    assert curve.lookup(0.01) != 0
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("1", True), ("on", True), ("TRUE", True),
+    ("0", False), ("Off", False), ("false", False),
+])
+def test_flags_accept_explicit_values(value, expected):
+    curve = ResponseCurve(invert=not expected)
+    curve.configure(["inv=" + value])
+    assert curve.invert is expected
+
+
+@pytest.mark.parametrize("value", ["no", "yes", "2", ""])
+def test_bad_flag_rejects_whole_line(value):
+    curve = ResponseCurve(min_duty=0.2)
+    with pytest.raises(ValueError):
+        curve.configure(["min=0.5", "inv=" + value])
+    assert curve.min_duty == 0.2
+    assert curve.invert is False
+
+
+class _Sink:
+    def __init__(self):
+        self.out = []
+
+    def write(self, data):
+        self.out.append(data)
+
+
+def test_dead_over_uart_moves_default_stop():
+    uart = _Sink()
+    parser = CommandParser(uart, None, None, None, None)
+    parser.handle_line("CURVE STEER dead=0.3")
+
+    curve = parser.steer_curve
+    for x in (0.05, 0.1, 0.2, 0.299, -0.2):
+        assert curve.lookup(x) == 0, x
+    assert curve.lookup(0.3) != 0
+    assert uart.out[-1].startswith("CURVE STEER stop=- dead=0.300")
+
+
+def test_explicit_stop_is_kept_until_reset():
+    curve = ResponseCurve(deadband=0.05)
+    curve.configure(["stop=0.2", "dead=0.1"])
+    assert curve.lookup(0.15) == 0
+    curve.configure(["stop=-"])
+    assert curve.lookup(0.15) != 0
+    assert curve.lookup(0.09) == 0